@@ -26,64 +26,102 @@
    #  - pets.json 이 {"이름": {...}, ...} 딕셔너리여도 되고
    #    [{...}, ...] 리스트여도 됨.
    python pet_s0sgauto_v2.py chat.txt --merge pets.json -o pets_merged.json
+
+3) orjson 이 설치돼 있으면 JSON 출력에 사용 (없으면 표준 json 모듈로 동작)
+   - 지수 표기 실수(1e+16 ↔ 1e16) 등 숫자 표기는 표준 json 과 조금 다를 수 있음
+   pip install orjson
 """
 import argparse
 import json
 import re
 import sys
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, BinaryIO, Iterable, Iterator
+
+try:
+    import orjson
+except ImportError:  # 선택 의존성: 없으면 표준 json 사용
+    orjson = None
+
+
+# 헤더/초기치/성장률을 하나의 패턴으로 묶어 라인당 한 번만 스캔한다.
+# 어떤 갈래가 맞았는지는 m.lastgroup ("HEADER" / "INIT" / "GROW") 으로 구분.
+# 세 갈래 모두 (strip 된) 라인 맨 앞에서 시작해야 하므로 LINE_RE.match() 로 쓴다.
+# 숫자는 \d 대신 [0-9]: 유니코드 숫자 테이블을 안 타고, \s 는 전각 공백까지 그대로 허용.
+LINE_RE = re.compile(
+    r"(?P<HEADER>\[(?P<name>[^\]]+)\]\s*(?:\[(?P<grade>[0-9])등급\]\s*)?페트 검색 결과 입니다\.)"
+    r"|(?P<INIT>초기\s*:\s*레벨\s*:?[\s0-9]*,"
+    r"\s*공격력\s*([0-9]+),"
+    r"\s*방어력\s*([0-9]+),"
+    r"\s*순발력\s*([0-9]+),"
+    r"\s*내구력\s*([0-9]+))"
+    r"|(?P<GROW>성장\s*:\s*공격력\s*([0-9]+(?:\.[0-9]+)?),"
+    r"\s*방어력\s*([0-9]+(?:\.[0-9]+)?),"
+    r"\s*순발력\s*([0-9]+(?:\.[0-9]+)?),"
+    r"\s*성장\s*[0-9]+(?:\.[0-9]+)?,"  # 총 성장값은 버림
+    r"\s*내구력\s*([0-9]+(?:\.[0-9]+)?))"
+)
 
+# INIT/GROW 갈래 안의 공격력/방어력/순발력/내구력 그룹 번호 (m.group(*...) 로 한 번에 꺼냄)
+INIT_GROUPS = tuple(range(LINE_RE.groupindex["INIT"] + 1, LINE_RE.groupindex["INIT"] + 5))
+GROW_GROUPS = tuple(range(LINE_RE.groupindex["GROW"] + 1, LINE_RE.groupindex["GROW"] + 5))
 
-HEADER_RE = re.compile(
-    r"^\[(?P<name>[^\]]+)\]\s*(?:\[(?P<grade>\d)등급\]\s*)?페트 검색 결과 입니다\."
-)
+ATTR_SEG_RE = re.compile(r"속성\s*:\s*([^,]+)")
+ATTR_TOKEN_RE = re.compile(r"([지수화풍])\s*([0-9]+)")
 
-INIT_RE = re.compile(
-    r"초기\s*:\s*레벨\s*:?[\s\d]*,"
-    r"\s*공격력\s*(?P<atk>\d+),"
-    r"\s*방어력\s*(?P<def>\d+),"
-    r"\s*순발력\s*(?P<agi>\d+),"
-    r"\s*내구력\s*(?P<hp>\d+)"
-)
+# merge 시 pets.json 에 반영하는 항목
+MERGE_KEYS = frozenset(("grade", "s0", "sg", "attr", "route"))
 
-GROW_RE = re.compile(
-    r"성장\s*:\s*공격력\s*(?P<atk>\d+(?:\.\d+)?),"
-    r"\s*방어력\s*(?P<def>\d+(?:\.\d+)?),"
-    r"\s*순발력\s*(?P<agi>\d+(?:\.\d+)?),"
-    r"\s*성장\s*\d+(?:\.\d+)?,"  # 총 성장값은 버림
-    r"\s*내구력\s*(?P<hp>\d+(?:\.\d+)?)"
-)
+# 속성 라인에 안 나온 원소는 0 으로 채운다
+EMPTY_ATTR = {"지": 0, "수": 0, "화": 0, "풍": 0}
 
-ATTR_SEG_RE = re.compile(r"속성\s*:\s*([^,]+)")
-ATTR_TOKEN_RE = re.compile(r"([지수화풍])\s*(\d+)")
-ROUTE_RE = re.compile(r"경로\s*:\s*(.+)")
+# 정규식 앞단/대신 쓰는 리터럴 (정규식보다 `in`/partition 검사가 훨씬 싸다)
+HEADER_KW = "페트 검색"
+INIT_KW = "초기"
+GROW_KW = "성장"
+SKILL_KW = "기술"
+ATTR_KW = "속성"
+ROUTE_KW = "경로"
 
+# 디코딩 전에 바이트 단계에서 거르는 용도 (UTF-8 은 부분 문자열 검사가 바이트에서도 그대로 성립)
+HEADER_KW_B = HEADER_KW.encode("utf-8")
+INIT_KW_B = INIT_KW.encode("utf-8")
+GROW_KW_B = GROW_KW.encode("utf-8")
+SKILL_KW_B = SKILL_KW.encode("utf-8")
 
-def grade_digit_to_str(d: str | None) -> str:
-    """1→최상급, 2→상급, 나머지/없음→일반"""
-    if d == "1":
-        return "최상급"
-    if d == "2":
-        return "상급"
-    return "일반"
 
+# 등급 숫자 → 표시명: 1→최상급, 2→상급, 나머지/없음→일반
+GRADE_MAP = {"1": "최상급", "2": "상급"}
 
-def parse_chat(text: str) -> Dict[str, Dict[str, Any]]:
+
+def iter_candidate_lines(f: BinaryIO) -> Iterator[str]:
+    """바이너리로 연 chat.txt 에서 키워드가 든 라인만 디코딩해서 돌려준다. (잡담 라인은 디코딩 안 함)"""
+    for raw in f:
+        if HEADER_KW_B in raw or INIT_KW_B in raw or GROW_KW_B in raw or SKILL_KW_B in raw:
+            yield raw.decode("utf-8")
+
+
+def parse_chat(lines: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+    """채팅 로그 라인들을 순서대로 읽어 {이름: 페트정보} 로 모은다. (파일 객체를 그대로 넘겨도 됨)"""
     pets: Dict[str, Dict[str, Any]] = {}
     current: Dict[str, Any] | None = None
 
-    for raw in text.splitlines():
-        line = raw.strip()
+    for raw in lines:
+        # 패턴은 라인 앞에 고정돼 있으니 앞쪽 공백만 지우면 된다
+        # (끝의 개행/공백은 경로 값에서만 의미가 있고, 거기서 따로 strip 함)
+        line = raw.lstrip()
         if not line:
             continue
 
+        m = None
+        if HEADER_KW in line or line.startswith((INIT_KW, GROW_KW)):
+            m = LINE_RE.match(line)
+        kind = m.lastgroup if m else None
+
         # 1) 헤더 라인: [이름] [1등급] 페트 검색 결과 입니다.
-        m = HEADER_RE.search(line)
-        if m:
+        if kind == "HEADER":
             name = m.group("name").strip()
             g_digit = m.group("grade")
-            g_str = grade_digit_to_str(g_digit)
 
             if name not in pets:
                 pets[name] = {"name": name}
@@ -91,7 +129,7 @@ def parse_chat(text: str) -> Dict[str, Dict[str, Any]]:
 
             # 등급은 "일반"보다 높은 값이 나왔으면 덮어쓰기 허용
             if g_digit is not None or "grade" not in current:
-                current["grade"] = g_str
+                current["grade"] = GRADE_MAP.get(g_digit, "일반")
             continue
 
         # 헤더가 한 번도 안 나온 상태라면 스킵
@@ -99,53 +137,41 @@ def parse_chat(text: str) -> Dict[str, Dict[str, Any]]:
             continue
 
         # 2) 초기치
-        m = INIT_RE.search(line)
-        if m:
-            s0 = {
-                "atk": int(m.group("atk")),
-                "def": int(m.group("def")),
-                "agi": int(m.group("agi")),
-                "hp": int(m.group("hp")),
-            }
-            current.setdefault("s0", {}).update(s0)
+        if kind == "INIT":
+            atk, def_, agi, hp = map(int, m.group(*INIT_GROUPS))
+            current["s0"] = {"atk": atk, "def": def_, "agi": agi, "hp": hp}
             continue
 
         # 3) 성장률
-        m = GROW_RE.search(line)
-        if m:
-            sg = {
-                "atk": float(m.group("atk")),
-                "def": float(m.group("def")),
-                "agi": float(m.group("agi")),
-                "hp": float(m.group("hp")),
-            }
-            current.setdefault("sg", {}).update(sg)
+        if kind == "GROW":
+            atk, def_, agi, hp = map(float, m.group(*GROW_GROUPS))
+            current["sg"] = {"atk": atk, "def": def_, "agi": agi, "hp": hp}
             continue
 
         # 4) 기술/속성/경로
-        if "기술" in line and "속성" in line:
+        if SKILL_KW in line and ATTR_KW in line:
             # 4-1) 속성
             m_attr = ATTR_SEG_RE.search(line)
             if m_attr:
-                seg = m_attr.group(1)
-                attr = {"지": 0, "수": 0, "화": 0, "풍": 0}
-                for tok in seg.split():
-                    tok = tok.strip()
-                    if not tok:
-                        continue
-                    m_tok = ATTR_TOKEN_RE.match(tok)
-                    if not m_tok:
-                        continue
-                    el, val = m_tok.groups()
-                    attr[el] = int(val)
-                if any(v > 0 for v in attr.values()):
+                pairs = ATTR_TOKEN_RE.findall(m_attr.group(1))
+                # 전부 0 인 속성은 기록하지 않음 (merge 시 기존 속성을 0 으로 덮어쓰지 않도록)
+                attr = {**EMPTY_ATTR, **{el: int(val) for el, val in pairs}}
+                if any(attr.values()):
                     current["attr"] = attr
 
             # 4-2) 경로
-            m_route = ROUTE_RE.search(line)
-            if m_route:
-                route = m_route.group(1).strip()
-                current["route"] = route
+            # "경로 : ..." 는 고정 문자열이라 정규식 없이 find 로 충분.
+            # 콜론이 안 붙은 "경로"(예: 기술 이름) 는 건너뛰고, 값이 빈 경우는 기록하지 않음
+            pos = line.find(ROUTE_KW)
+            while pos >= 0:
+                pos += len(ROUTE_KW)
+                tail = line[pos:].lstrip()
+                if tail.startswith(":"):
+                    route = tail[1:].strip()
+                    if route:
+                        current["route"] = route
+                        break
+                pos = line.find(ROUTE_KW, pos)
 
     return pets
 
@@ -168,13 +194,13 @@ def merge_into_pets(base_path: Path, patch: Dict[str, Dict[str, Any]]):
             if not isinstance(target, dict):
                 continue
             # 병합
-            for key in ("grade", "s0", "sg", "attr", "route"):
-                if key not in extra:
+            for key, val in extra.items():
+                if key not in MERGE_KEYS:
                     continue
-                if isinstance(extra[key], dict) and isinstance(target.get(key), dict):
-                    target[key].update(extra[key])
+                if isinstance(val, dict) and isinstance(target.get(key), dict):
+                    target[key].update(val)
                 else:
-                    target[key] = extra[key]
+                    target[key] = val
         return data
 
     # list 형태: [{...}, ...]
@@ -188,18 +214,19 @@ def merge_into_pets(base_path: Path, patch: Dict[str, Dict[str, Any]]):
             target = by_name.get(name)
             if not target:
                 new_obj = {"name": name}
-                for key in ("grade", "s0", "sg", "attr", "route"):
-                    if key in extra:
-                        new_obj[key] = extra[key]
+                for key, val in extra.items():
+                    if key in MERGE_KEYS:
+                        new_obj[key] = val
                 data.append(new_obj)
                 continue
 
-            for key in ("grade", "s0", "sg", "attr", "route"):
-                if key in extra:
-                    if isinstance(extra[key], dict) and isinstance(target.get(key), dict):
-                        target[key].update(extra[key])
-                    else:
-                        target[key] = extra[key]
+            for key, val in extra.items():
+                if key not in MERGE_KEYS:
+                    continue
+                if isinstance(val, dict) and isinstance(target.get(key), dict):
+                    target[key].update(val)
+                else:
+                    target[key] = val
         return data
 
     raise ValueError("pets.json 형식을 알 수 없습니다. dict 또는 list 여야 합니다.")
@@ -226,15 +253,12 @@ def main(argv: list[str] | None = None) -> None:
     if not chat_path.is_file():
         p.error(f"채팅 로그 파일을 찾을 수 없습니다: {chat_path}")
 
-    text = chat_path.read_text(encoding="utf-8")
-    parsed = parse_chat(text)
+    # 파일 전체를 문자열로 올리지 않고 한 줄씩 흘려서 파싱 (키워드 없는 라인은 바이트 상태로 버림)
+    with chat_path.open("rb", buffering=1 << 20) as f:
+        parsed = parse_chat(iter_candidate_lines(f))
 
-    # 기본 출력은 "이름 기준 정렬된 리스트"
-    extracted_list: list[dict] = []
-    for name in sorted(parsed.keys(), key=lambda s: s):
-        obj = parsed[name].copy()
-        obj["name"] = name
-        extracted_list.append(obj)
+    # 기본 출력은 "이름 기준 정렬된 리스트" (parse_chat 이 이미 "name" 을 넣어 둠)
+    extracted_list: list[dict] = [parsed[name] for name in sorted(parsed)]
 
     if args.merge:
         base_path = Path(args.merge)
@@ -246,14 +270,21 @@ def main(argv: list[str] | None = None) -> None:
 
     if args.out:
         out_path = Path(args.out)
-        out_path.write_text(
-            json.dumps(result, ensure_ascii=False, indent=2),
-            encoding="utf-8"
-        )
+        if orjson is not None:
+            out_path.write_bytes(orjson.dumps(result, option=orjson.OPT_INDENT_2))
+        else:
+            # 전체 문자열을 만들지 않고 조각 단위로 바로 파일에 쓴다
+            # (newline="\n": orjson 경로와 같은 LF 파일이 나오도록, 윈도우에서도 CRLF 변환 안 함)
+            enc = json.JSONEncoder(ensure_ascii=False, indent=2)
+            with out_path.open("w", encoding="utf-8", newline="\n") as f:
+                f.writelines(enc.iterencode(result))
         print(f"저장 완료: {out_path}")
+    elif orjson is not None:
+        # 콘솔 인코딩/개행 변환을 표준 json 경로와 똑같이 타도록 텍스트로 한 번에 쓴다
+        sys.stdout.write(orjson.dumps(result, option=orjson.OPT_INDENT_2).decode("utf-8") + "\n")
     else:
-        json.dump(result, sys.stdout, ensure_ascii=False, indent=2)
-        sys.stdout.write("\n")
+        # json.dump 는 조각조각 write 하므로 한 번에 직렬화해서 한 번만 쓴다
+        sys.stdout.write(json.dumps(result, ensure_ascii=False, indent=2) + "\n")
 
 
 if __name__ == "__main__":